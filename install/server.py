@@ -12,25 +12,180 @@ import threading
 import time
 import platform
 import re
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import shutil
+import queue
+import uuid
+import gzip
+import socket
+import logging
+import logging.handlers
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
-import socket
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        """Encode obj as JSON bytes"""
+        return json.dumps(obj).encode()
 
 VERSION = "1.0.0"
 DEFAULT_PORT = 8887
 
+# Content types for the installer files served by APIHandler.serve_file
+CONTENT_TYPES = {
+    '.html': 'text/html',
+    '.js': 'application/javascript',
+    '.css': 'text/css',
+    '.conf': 'text/plain'
+}
+
+# Seconds before a package manager call is abandoned. Queries fall back to
+# the last known result; installs get a generous cap so a hung network
+# download cannot hold a request thread forever.
+QUERY_TIMEOUT = 30
+INSTALL_TIMEOUT = 1800
+
+# subprocess only takes its posix_spawn fast path (vfork on Linux with
+# Python >= 3.10) for an absolute executable path and close_fds=False.
+# Our own descriptors are non-inheritable by default, so skipping the
+# close_fds sweep does not leak the listening socket into children.
+FAST_SPAWN = os.name == 'posix' and getattr(subprocess, '_USE_POSIX_SPAWN', False)
+
+log = logging.getLogger("desktop.install")
+
+# ANTHROPIC_API_KEY=value in .env, without surrounding quotes or a trailing # comment;
+# [ \t] rather than \s so an empty value can't run on into the next line
+_API_KEY_RE = re.compile(r'^[ \t]*ANTHROPIC_API_KEY[ \t]*=[ \t]*["\']?([^"\'#\r\n]*)', re.M)
+
+
+def _decode(field):
+    """Decode one field of raw package manager output"""
+    return field.decode('utf-8', 'replace')
+
+
+# {command: absolute path} for commands found on PATH
+_executables = {}
+
+
+def find_executable(command):
+    """shutil.which, remembering hits so repeated lookups skip the PATH walk
+    
+    Misses are not remembered, so a tool installed while the server runs is found.
+    """
+    path = _executables.get(command)
+    if path is None:
+        path = shutil.which(command)
+        if path:
+            _executables[command] = path
+    return path
+
+
+def _spawn_args(cmd, kwargs):
+    """Adjust cmd and kwargs so CPython can avoid a full fork where it can"""
+    if FAST_SPAWN and 'cwd' not in kwargs and not kwargs.get('shell'):
+        executable = find_executable(cmd[0])
+        if executable:
+            cmd = [executable, *cmd[1:]]
+        kwargs.setdefault('close_fds', False)
+    return cmd
+
+
+def run_command(cmd, **kwargs):
+    """Run a command via subprocess.run, letting CPython avoid a full fork where it can"""
+    cmd = _spawn_args(cmd, kwargs)
+    return subprocess.run(cmd, **kwargs)
+
+
+def remove_tree(path):
+    """Delete a directory tree - via rm -rf on POSIX, which beats a Python-level walk on big checkouts"""
+    if os.name == 'posix':
+        run_command(["rm", "-rf", "--", str(path)], stderr=subprocess.PIPE, text=True, check=True)
+    else:
+        shutil.rmtree(path)
+
+
+def stream_command(cmd, timeout=QUERY_TIMEOUT):
+    """Yield a command's stdout lines (bytes) as it writes them
+    
+    Large listings are parsed while the command still runs instead of being
+    buffered whole first. Raises subprocess.TimeoutExpired if the command
+    outlives timeout.
+    """
+    kwargs = {}
+    cmd = _spawn_args(cmd, kwargs)
+    expired = threading.Event()
+    
+    def kill():
+        expired.set()
+        proc.kill()
+    
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **kwargs) as proc:
+        timer = threading.Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield from proc.stdout
+        finally:
+            timer.cancel()
+            # The caller stopped reading early
+            if proc.poll() is None:
+                proc.kill()
+    if expired.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+
+def run_commands(cmds, **kwargs):
+    """Run independent commands concurrently - returns their results in order"""
+    with ThreadPoolExecutor(max_workers=len(cmds)) as executor:
+        return list(executor.map(lambda cmd: run_command(cmd, **kwargs), cmds))
+
+
 class PackageManager:
     """Handles package detection and management across platforms"""
     
     def __init__(self, base_dir):
         self.base_dir = Path(base_dir)
         self.packages_file = self.base_dir / "desktop.conf"
+        # GitHub repos go in the webroot when running from desktop/install
+        # (or any install/ directory), else under ~/Applications/GitHub
+        base_path = self.base_dir.resolve()
+        if base_path.name == 'install' and base_path.parent.name == 'desktop':
+            self.webroot = base_path.parent.parent
+        elif base_path.name == 'install':
+            self.webroot = base_path.parent
+        else:
+            self.webroot = None
+        self.github_fallback = Path.home() / "Applications" / "GitHub"
         self.os_type = self.detect_os()
         self.pkg_manager = self.detect_package_manager()
         self.cache = {}
         self.cache_time = 0
         self.cache_ttl = 300  # Cache for 5 minutes instead of 30 seconds
+        self._cache_lock = threading.Lock()
+        # Notified whenever a new status list is stored
+        self._cache_updated = threading.Condition(self._cache_lock)
+        # Set to wake the background refresher early
+        self._refresh_event = threading.Event()
+        self._refresher = None
+        # (timestamp, {name: version}) from the batched installed query
+        self._installed_list = None
+        # (timestamp, installed casks, installed formulae) when using brew
+        self._brew_lists = None
+        # (timestamp, {name: new_version}) from the batched outdated query
+        self._outdated_list = None
+        # Bumped by clear_listing_cache() whenever packages are installed, updated or removed
+        self._listing_generation = 0
+        # (desktop.conf mtime, parsed read_packages() result)
+        self._packages_parsed = None
+        # (read_packages() result, enabled names derived from it)
+        self._enabled_packages = None
+        # Package status survives restarts while desktop.conf and the package database are unchanged
+        self.cache_file = Path.home() / ".cache" / "desktop" / "pkgstatus.json"
+        self._load_cache_file()
         
     def detect_os(self):
         """Detect operating system"""
@@ -65,386 +220,586 @@ class PackageManager:
     
     def command_exists(self, command):
         """Check if command exists in PATH"""
-        try:
-            if self.os_type == "windows":
-                subprocess.run(["where", command], 
-                             capture_output=True, check=True)
-            else:
-                subprocess.run(["which", command], 
-                             capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return find_executable(command) is not None
     
     def read_packages(self):
-        """Read packages from config file"""
-        packages = []
-        all_packages = []
+        """Read packages from config file as parallel (names, enabled, descriptions) lists
         
+        The parsed result is kept until desktop.conf's mtime changes.
+        """
         try:
-            with open(self.packages_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Skip lines starting with ##
-                    if line.startswith('##'):
-                        continue
-                    
-                    is_commented = line.startswith('#')
-                    
-                    # Remove leading # if present
-                    if is_commented:
-                        line = line[1:].strip()
-                    
-                    # Split on # to separate package name from description
-                    parts = line.split('#', 1)
-                    package_name = parts[0].strip()
-                    description = parts[1].strip() if len(parts) > 1 else ''
-                    
-                    if package_name:
-                        all_packages.append({
-                            'name': package_name,
-                            'enabled': not is_commented,
-                            'description': description
-                        })
-                        if not is_commented:
-                            packages.append(package_name)
+            mtime = self.packages_file.stat().st_mtime_ns
         except FileNotFoundError:
-            pass
+            return [], [], []
+        
+        parsed = self._packages_parsed
+        if parsed is not None and parsed[0] == mtime:
+            return parsed[1]
+        
+        names = []
+        enabled = []
+        descriptions = []
         
-        return packages, all_packages
-    
-    def is_installed(self, package):
-        """Check if package is installed"""
         try:
-            if self.pkg_manager == "brew":
-                result = subprocess.run(
-                    ["brew", "list", "--cask", package],
-                    capture_output=True, text=True
-                )
-                if result.returncode != 0:
-                    result = subprocess.run(
-                        ["brew", "list", package],
-                        capture_output=True, text=True
-                    )
-                return result.returncode == 0
-                
-            elif self.pkg_manager == "apt":
-                result = subprocess.run(
-                    ["dpkg", "-l", package],
-                    capture_output=True, text=True
-                )
-                return "ii" in result.stdout
-                
-            elif self.pkg_manager in ["dnf", "yum"]:
-                result = subprocess.run(
-                    ["rpm", "-qa", package],
-                    capture_output=True, text=True
-                )
-                return package in result.stdout
-                
-            elif self.pkg_manager == "flatpak":
-                result = subprocess.run(
-                    ["flatpak", "list"],
-                    capture_output=True, text=True
-                )
-                return package in result.stdout
-                
-            elif self.pkg_manager == "winget":
-                result = subprocess.run(
-                    ["winget", "list", package],
-                    capture_output=True, text=True
-                )
-                return package.lower() in result.stdout.lower()
-                
-        except Exception as e:
-            print(f"Error checking if {package} is installed: {e}")
+            data = self.packages_file.read_text()
+        except FileNotFoundError:
+            return names, enabled, descriptions
         
-        return False
+        for line in data.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            
+            # Skip lines starting with ##
+            if line.startswith('##'):
+                continue
+            
+            is_commented = line.startswith('#')
+            
+            # Remove leading # if present
+            if is_commented:
+                line = line[1:].strip()
+            
+            # Split on # to separate package name from description
+            parts = line.split('#', 1)
+            package_name = parts[0].strip()
+            description = parts[1].strip() if len(parts) > 1 else ''
+            
+            if package_name:
+                names.append(package_name)
+                enabled.append(not is_commented)
+                descriptions.append(description)
+        
+        parsed = (names, enabled, descriptions)
+        self._packages_parsed = (mtime, parsed)
+        return parsed
     
-    def get_version(self, package):
-        """Get installed version of package"""
-        try:
-            if self.pkg_manager == "brew":
-                result = subprocess.run(
-                    ["brew", "info", "--cask", package],
-                    capture_output=True, text=True
-                )
-                if result.returncode != 0:
-                    result = subprocess.run(
-                        ["brew", "info", package],
-                        capture_output=True, text=True
-                    )
-                
-                # Extract version from brew info output
-                match = re.search(r'(\d+\.\d+(?:\.\d+)?)', result.stdout)
-                if match:
-                    return match.group(1)
-                    
-            elif self.pkg_manager == "apt":
-                result = subprocess.run(
-                    ["dpkg", "-l", package],
-                    capture_output=True, text=True
-                )
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if line.startswith("ii"):
-                        parts = line.split()
-                        if len(parts) >= 3:
-                            return parts[2]
-                            
-            elif self.pkg_manager in ["dnf", "yum"]:
-                result = subprocess.run(
-                    ["rpm", "-q", package],
-                    capture_output=True, text=True
-                )
-                # Extract version from rpm output
-                match = re.search(r'-(\d+\.\d+(?:\.\d+)?)', result.stdout)
-                if match:
-                    return match.group(1)
-                    
-            elif self.pkg_manager == "winget":
-                result = subprocess.run(
-                    ["winget", "list", package],
-                    capture_output=True, text=True
-                )
-                # Parse winget output for version
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if package.lower() in line.lower():
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            return parts[1]
-                            
-        except Exception as e:
-            print(f"Error getting version for {package}: {e}")
+    def enabled_packages(self):
+        """Names of the packages not commented out in desktop.conf, recomputed only when it is re-read"""
+        parsed = self.read_packages()
+        cached = self._enabled_packages
+        if cached is not None and cached[0] is parsed:
+            return cached[1]
         
-        return "unknown"
+        names, enabled, _ = parsed
+        enabled_names = [name for name, is_enabled in zip(names, enabled) if is_enabled]
+        self._enabled_packages = (parsed, enabled_names)
+        return enabled_names
     
-    def get_update_info(self, package):
-        """Check if update is available"""
-        try:
-            if self.pkg_manager == "brew":
-                result = subprocess.run(
-                    ["brew", "outdated", "--cask", package],
-                    capture_output=True, text=True
-                )
-                if result.returncode != 0:
-                    result = subprocess.run(
-                        ["brew", "outdated", package],
-                        capture_output=True, text=True
-                    )
-                
-                if package in result.stdout:
-                    # Extract new version
-                    match = re.search(r'(\d+\.\d+(?:\.\d+)?)\s*<\s*(\d+\.\d+(?:\.\d+)?)', 
-                                    result.stdout)
-                    if match:
-                        return {
-                            'available': True,
-                            'new_version': match.group(2)
-                        }
-                        
-            elif self.pkg_manager == "apt":
-                result = subprocess.run(
-                    ["apt", "list", "--upgradable", package],
-                    capture_output=True, text=True
-                )
-                if package in result.stdout:
-                    match = re.search(r'\[upgradable from: ([\d.]+)\]', result.stdout)
-                    if match:
-                        return {
-                            'available': True,
-                            'new_version': 'available'
-                        }
-                        
-        except Exception as e:
-            print(f"Error checking updates for {package}: {e}")
+    def clear_listing_cache(self):
+        """Expire the batched package manager listings after packages changed
         
-        return {
-            'available': False,
-            'new_version': None
-        }
+        The installed and outdated listings are kept to fall back on if the
+        next query fails. A status list built from listings taken before this
+        call is no longer stored.
+        """
+        with self._cache_lock:
+            self._listing_generation += 1
+        self._expire_listings()
+    
+    def _expire_listings(self):
+        """Make the next lookup re-query the batched listings"""
+        with self._cache_lock:
+            if self._installed_list:
+                self._installed_list = (0, self._installed_list[1])
+            if self._outdated_list:
+                self._outdated_list = (0, self._outdated_list[1])
+            self._brew_lists = None
     
-    def get_package_status(self, package_name, description=''):
-        """Get complete status for a package"""
-        installed = self.is_installed(package_name)
-        version = None
-        update_info = {'available': False, 'new_version': None}
+    def _listing_key(self, package):
+        """Get the key package is listed under - winget ids and names are case-insensitive"""
+        return package.lower() if self.pkg_manager == "winget" else package
+    
+    def _brew_installed(self):
+        """Get the (casks, formulae) sets installed via brew, listed once per cache_ttl"""
+        with self._cache_lock:
+            listed = self._brew_lists
+        if listed and (time.time() - listed[0]) < self.cache_ttl:
+            return listed[1], listed[2]
+        
+        cask_result, formula_result = run_commands(
+            [["brew", "list", "--cask", "-1"], ["brew", "list", "--formula", "-1"]],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=QUERY_TIMEOUT
+        )
+        casks = set(cask_result.stdout.split())
+        formulae = set(formula_result.stdout.split())
         
-        if installed:
-            version = self.get_version(package_name)
-            update_info = self.get_update_info(package_name)
+        with self._cache_lock:
+            self._brew_lists = (time.time(), casks, formulae)
+        return casks, formulae
+    
+    def _brew_type_args(self, package):
+        """Get the brew flag selecting package's type, so brew runs once instead of trying both"""
+        casks, _ = self._brew_installed()
+        return ["--cask"] if package in casks else ["--formula"]
+    
+    def get_package_status(self, package_name, description='', snapshot=None):
+        """Get complete status for a package, looked up in a _snapshot() dict"""
+        if snapshot is None:
+            snapshot, _ = self._snapshot()
+        installed, version, new_version = snapshot.get(self._listing_key(package_name), (False, None, None))
         
         return {
             'name': package_name,
             'description': description,
             'installed': installed,
             'version': version,
-            'update_available': update_info['available'],
-            'new_version': update_info['new_version']
+            'update_available': new_version is not None,
+            'new_version': new_version
         }
     
     def get_all_packages_status(self, force_refresh=False):
         """Get status for all packages with caching"""
         current_time = time.time()
         
-        if not force_refresh and (current_time - self.cache_time) < self.cache_ttl:
-            if 'packages' in self.cache:
-                return self.cache['packages']
+        with self._cache_lock:
+            # With the background refresher running, reads never run a refresh of their own;
+            # on a cold start they wait for the refresher's first list instead
+            if not force_refresh and self._refresher is not None and 'packages' not in self.cache:
+                self._cache_updated.wait_for(lambda: 'packages' in self.cache, QUERY_TIMEOUT * 2)
+            if not force_refresh and 'packages' in self.cache:
+                if self._refresher is not None or (current_time - self.cache_time) < self.cache_ttl:
+                    return self.cache['packages']
         
-        print(f"[PackageManager] Starting package status check at {current_time}")
+        log.debug("[PackageManager] Starting package status check at %s", current_time)
         start_time = time.time()
         
-        enabled_packages, all_packages = self.read_packages()
-        packages_status = []
-        
-        # Get all installed packages in one batch operation
-        installed_packages = self.get_all_installed_packages()
-        print(f"[PackageManager] Got installed packages list in {time.time() - start_time:.2f}s")
+        names, enabled, descriptions = self.read_packages()
         
-        for pkg_info in all_packages:
-            pkg_name = pkg_info['name']
+        if force_refresh:
+            self._expire_listings()
+        for _ in range(3):
+            with self._cache_lock:
+                generation = self._listing_generation
             
-            # Handle GitHub packages separately
-            if pkg_name.startswith('github:'):
-                repo = pkg_name[7:]  # Remove 'github:' prefix
-                parts = repo.split('/')
-                if len(parts) == 2:
-                    repo_name = parts[1]
-                    
-                    # Check webroot location first (if in desktop/install structure)
-                    base_path = Path(self.base_dir).resolve()
-                    is_installed = False
-                    
-                    if base_path.name == 'install' and base_path.parent.name == 'desktop':
-                        # Check webroot
-                        webroot = base_path.parent.parent
-                        install_dir = webroot / repo_name
-                        is_installed = install_dir.exists()
-                    elif base_path.name == 'install':
-                        # Check parent as webroot
-                        webroot = base_path.parent
-                        install_dir = webroot / repo_name
-                        is_installed = install_dir.exists()
-                    
-                    # Fallback to ~/Applications/GitHub
-                    if not is_installed:
-                        apps_dir = Path.home() / "Applications" / "GitHub"
-                        install_dir = apps_dir / repo_name
-                        is_installed = install_dir.exists()
-                    
-                    status = {
-                        'name': pkg_name,
-                        'description': pkg_info.get('description', ''),
-                        'installed': is_installed,
-                        'version': 'git' if is_installed else None,
-                        'update_available': False,
-                        'new_version': None,
-                        'enabled': pkg_info['enabled']
-                    }
-                    packages_status.append(status)
-                    continue
+            # Get installed and outdated packages in one batch operation
+            snapshot, complete = self._snapshot()
+            log.debug("[PackageManager] Got installed packages list in %.2fs", time.time() - start_time)
+            checkouts = self._github_checkouts()
             
-            # Regular package manager packages
-            is_installed = pkg_name in installed_packages
+            packages_status = [
+                self._package_entry_status(pkg_name, is_enabled, description, snapshot, checkouts)
+                for pkg_name, is_enabled, description in zip(names, enabled, descriptions)
+            ]
             
-            status = {
+            if self._store_packages(packages_status, current_time, generation=generation):
+                break
+            # A job changed packages while they were listed; this list may predate it
+            log.debug("[PackageManager] Packages changed during status check, listing again")
+        else:
+            with self._cache_lock:
+                return self.cache.get('packages', packages_status)
+        
+        # A listing that failed fell back to older data; don't persist it as current
+        if complete:
+            self._save_cache_file(packages_status)
+        else:
+            log.warning("[PackageManager] Package listing failed, kept the previous results")
+        
+        log.debug("[PackageManager] Completed status check in %.2fs", time.time() - start_time)
+        return packages_status
+    
+    def _store_packages(self, packages_status, timestamp, replacing=None, generation=None):
+        """Put a package status list into the in-memory cache - returns whether it was stored
+        
+        With replacing, the list is only stored if the cache still holds that list;
+        with generation, only if no packages changed since that listing generation.
+        """
+        # Serialize the list once per refresh rather than once per request;
+        # the /api/packages and /api/refresh bodies are built around it
+        packages_list_json = _dumps(packages_status)
+        packages_json = b'{"packages":%s,"os":%s,"package_manager":%s}' % (
+            packages_list_json, _dumps(self.os_type), _dumps(self.pkg_manager)
+        )
+        packages_json_gz = gzip.compress(packages_json)
+        
+        with self._cache_lock:
+            if replacing is not None and self.cache.get('packages') is not replacing:
+                return False
+            if generation is not None and generation != self._listing_generation:
+                return False
+            self.cache['packages'] = packages_status
+            self.cache['packages_list_json'] = packages_list_json
+            self.cache['packages_json'] = packages_json
+            self.cache['packages_json_gz'] = packages_json_gz
+            self.cache_time = timestamp
+            self._cache_updated.notify_all()
+        return True
+    
+    def patch_cache(self, results):
+        """Re-check just these packages in the cached status list after installing, updating or removing them
+        
+        results is {package: success} from that run. Their entries are rebuilt
+        from one fresh installed listing and the rest of the list is kept as is;
+        a package whose run failed keeps its pending update, and the next
+        background refresh fills in the others.
+        """
+        with self._cache_lock:
+            packages_status = self.cache.get('packages')
+            timestamp = self.cache_time
+        if packages_status is None:
+            return
+        
+        changed = set(results)
+        prior = {entry['name']: entry['new_version'] for entry in packages_status if entry['name'] in changed}
+        installed = self._installed_packages()
+        snapshot = {}
+        for package in changed:
+            key = self._listing_key(package)
+            if key in installed:
+                snapshot[key] = (True, installed[key], None if results[package] else prior.get(package))
+        checkouts = self._github_checkouts() if any(p.startswith('github:') for p in changed) else set()
+        
+        patched = [
+            self._package_entry_status(entry['name'], entry['enabled'], entry['description'], snapshot, checkouts)
+            if entry['name'] in changed else entry
+            for entry in packages_status
+        ]
+        self._store_packages(patched, timestamp, replacing=packages_status)
+    
+    def _package_db_paths(self):
+        """Get files/directories whose mtime changes when the package manager installs or removes something"""
+        if self.pkg_manager == "apt":
+            return [Path("/var/lib/dpkg/status")]
+        elif self.pkg_manager in ["dnf", "yum"]:
+            return [Path("/var/lib/rpm")]
+        elif self.pkg_manager == "flatpak":
+            return [Path("/var/lib/flatpak/app")]
+        elif self.pkg_manager == "brew":
+            prefix = Path(find_executable("brew")).parent.parent
+            return [prefix / "Cellar", prefix / "Caskroom"]
+        return []
+    
+    def _cache_signature(self):
+        """Identify the inputs a package status list was computed from"""
+        mtimes = []
+        for path in [self.packages_file, *self._package_db_paths()]:
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return [self.pkg_manager, str(self.packages_file.resolve()), *mtimes]
+    
+    def _load_cache_file(self):
+        """Restore the package status saved by a previous server run if nothing it depends on changed"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                saved = json.load(f)
+            if saved['signature'] != self._cache_signature():
+                return
+            
+            self._store_packages(saved['packages'], time.time())
+            log.info(f"[PackageManager] Loaded cached package status from {self.cache_file}")
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                log.warning(f"[PackageManager] Ignoring unreadable cache file: {e}")
+    
+    def _save_cache_file(self, packages_status):
+        """Write the package status to disk, with its signature, so a restart can reuse it"""
+        tmp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps({
+                    'signature': self._cache_signature(),
+                    'packages': packages_status
+                }))
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            log.warning(f"[PackageManager] Could not write cache file: {e}")
+    
+    def start_background_refresh(self):
+        """Refresh the status cache now and every cache_ttl seconds after, off the request path"""
+        self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._refresher.start()
+    
+    def _refresh_loop(self):
+        """Rebuild the status cache every cache_ttl seconds, or sooner when woken by refresh()"""
+        while True:
+            self._refresh_event.clear()
+            try:
+                self.get_all_packages_status(force_refresh=True)
+            except Exception as e:
+                log.error(f"[PackageManager] Background refresh failed: {e}")
+            self._refresh_event.wait(self.cache_ttl)
+    
+    def refresh(self, timeout=None):
+        """Get a status list computed after this call, waiting up to timeout for the refresher
+        
+        Concurrent callers share one refresh. Returns the current list if the wait times out.
+        """
+        if self._refresher is None:
+            return self.get_all_packages_status(force_refresh=True)
+        
+        requested = time.time()
+        with self._cache_updated:
+            self._refresh_event.set()
+            self._cache_updated.wait_for(lambda: self.cache_time >= requested, timeout)
+            return self.cache.get('packages', [])
+    
+    def get_packages_json(self, gzipped=False):
+        """Get the encoded /api/packages response body for the current cache, optionally gzipped"""
+        self.get_all_packages_status()
+        with self._cache_lock:
+            return self.cache['packages_json_gz' if gzipped else 'packages_json']
+    
+    def get_packages_list_json(self):
+        """Get the current status list as encoded JSON, with the time it was computed"""
+        self.get_all_packages_status()
+        with self._cache_lock:
+            return self.cache['packages_list_json'], self.cache_time
+    
+    def _github_install_dir(self, repo_name):
+        """Get (checkout directory, whether it exists) for a GitHub repo
+        
+        An existing checkout in the webroot wins over one in ~/Applications/GitHub;
+        new clones go to the webroot when there is one.
+        """
+        if self.webroot is not None:
+            install_dir = self.webroot / repo_name
+            if install_dir.exists():
+                return install_dir, True
+        
+        fallback_dir = self.github_fallback / repo_name
+        if fallback_dir.exists():
+            return fallback_dir, True
+        return (self.webroot / repo_name if self.webroot is not None else fallback_dir), False
+    
+    def _github_checkouts(self):
+        """Names present in the webroot and ~/Applications/GitHub, one scandir each"""
+        names = set()
+        for directory in (self.webroot, self.github_fallback):
+            if directory is None:
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    names.update(entry.name for entry in entries)
+            except OSError:
+                pass
+        return names
+    
+    def _package_entry_status(self, pkg_name, enabled, description, snapshot, checkouts):
+        """Get the status entry for one desktop.conf package"""
+        # Commented-out packages are shown but not managed, so don't probe them
+        if not enabled:
+            return {
                 'name': pkg_name,
-                'description': pkg_info.get('description', ''),
-                'installed': is_installed,
-                'version': installed_packages.get(pkg_name, {}).get('version', None) if is_installed else None,
-                'update_available': False,  # Skip update checks for speed
+                'description': description,
+                'installed': False,
+                'version': None,
+                'update_available': False,
                 'new_version': None,
-                'enabled': pkg_info['enabled']
+                'enabled': False
             }
-            packages_status.append(status)
         
-        self.cache['packages'] = packages_status
-        self.cache_time = current_time
+        # Handle GitHub packages separately
+        if pkg_name.startswith('github:'):
+            repo = pkg_name[7:]  # Remove 'github:' prefix
+            parts = repo.split('/')
+            if len(parts) == 2:
+                repo_name = parts[1]
+                
+                # Cloned into the webroot or ~/Applications/GitHub
+                is_installed = repo_name in checkouts
+                
+                return {
+                    'name': pkg_name,
+                    'description': description,
+                    'installed': is_installed,
+                    'version': 'git' if is_installed else None,
+                    'update_available': False,
+                    'new_version': None,
+                    'enabled': enabled
+                }
+        
+        # Regular package manager packages
+        status = self.get_package_status(pkg_name, description, snapshot)
+        status['enabled'] = enabled
+        return status
+    
+    def _snapshot(self):
+        """Build {package: (installed, version, new_version)} from one batch query per backend
         
-        print(f"[PackageManager] Completed status check in {time.time() - start_time:.2f}s")
-        return packages_status
+        Returns (snapshot, complete); complete is False if either listing failed.
+        """
+        # The two listings are independent, so wait on both child processes at once
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            outdated_future = executor.submit(self._cached_listing, '_outdated_list', self.get_outdated_packages)
+            installed, installed_ok = self._cached_listing('_installed_list', self.get_all_installed_packages)
+            outdated, outdated_ok = outdated_future.result()
+        
+        snapshot = {
+            name: (True, version, outdated.get(name))
+            for name, version in installed.items()
+        }
+        return snapshot, installed_ok and outdated_ok
+    
+    def _cached_listing(self, attr, query):
+        """Get query()'s listing, run at most once per cache_ttl - returns (listing, ok)
+        
+        A query that fails (returns None) keeps the last known listing, to be
+        retried on the next call, and ok is False. A listing taken while
+        packages changed is returned but not kept.
+        """
+        with self._cache_lock:
+            listed = getattr(self, attr)
+            generation = self._listing_generation
+        if listed and (time.time() - listed[0]) < self.cache_ttl:
+            return listed[1], True
+        
+        listing = query()
+        if listing is None:
+            return (listed[1] if listed else {}), False
+        with self._cache_lock:
+            if generation == self._listing_generation:
+                setattr(self, attr, (time.time(), listing))
+        return listing, True
+    
+    def _installed_packages(self):
+        """Get get_all_installed_packages(), run at most once per cache_ttl"""
+        return self._cached_listing('_installed_list', self.get_all_installed_packages)[0]
     
     def get_all_installed_packages(self):
-        """Get all installed packages in one batch operation - MUCH faster"""
+        """Get all installed packages in one batch operation - returns {name: version}, or None on failure
+        
+        Listings are parsed as bytes while the command runs; only the name
+        and version fields are decoded.
+        """
         installed = {}
         
         try:
             if self.pkg_manager == "brew":
-                # Get all casks at once
-                result = subprocess.run(
-                    ["brew", "list", "--cask", "--versions"],
-                    capture_output=True, text=True, timeout=10
-                )
-                for line in result.stdout.split('\n'):
-                    if line.strip():
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            installed[parts[0]] = {'version': parts[1]}
-                
-                # Get all formulae at once
-                result = subprocess.run(
-                    ["brew", "list", "--formula", "--versions"],
-                    capture_output=True, text=True, timeout=10
+                # List all casks and all formulae at once, each brew startup in parallel
+                results = run_commands(
+                    [["brew", "list", "--cask", "--versions"], ["brew", "list", "--formula", "--versions"]],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=QUERY_TIMEOUT
                 )
-                for line in result.stdout.split('\n'):
-                    if line.strip():
+                for result in results:
+                    for line in result.stdout.splitlines():
                         parts = line.split()
                         if len(parts) >= 2:
-                            installed[parts[0]] = {'version': parts[1]}
+                            installed[_decode(parts[0])] = _decode(parts[1])
                             
             elif self.pkg_manager == "apt":
-                result = subprocess.run(
-                    ["dpkg-query", "-W", "-f=${Package}\t${Version}\n"],
-                    capture_output=True, text=True, timeout=10
-                )
-                for line in result.stdout.split('\n'):
-                    if '\t' in line:
-                        pkg, ver = line.split('\t', 1)
-                        installed[pkg] = {'version': ver}
+                for line in stream_command(["dpkg-query", "-W", "-f=${Package}\t${Status}\t${Version}\n"]):
+                    parts = line.rstrip(b'\n').split(b'\t')
+                    # Skip removed packages that only left their config files behind
+                    if len(parts) == 3 and parts[1].endswith(b' installed'):
+                        installed[_decode(parts[0])] = _decode(parts[2])
                         
             elif self.pkg_manager in ["dnf", "yum"]:
-                result = subprocess.run(
-                    ["rpm", "-qa", "--queryformat", "%{NAME}\t%{VERSION}\n"],
-                    capture_output=True, text=True, timeout=10
-                )
-                for line in result.stdout.split('\n'):
-                    if '\t' in line:
-                        pkg, ver = line.split('\t', 1)
-                        installed[pkg] = {'version': ver}
+                for line in stream_command(["rpm", "-qa", "--queryformat", "%{NAME}\t%{VERSION}\n"]):
+                    if b'\t' in line:
+                        pkg, ver = line.rstrip(b'\n').split(b'\t', 1)
+                        installed[_decode(pkg)] = _decode(ver)
                         
             elif self.pkg_manager == "flatpak":
-                result = subprocess.run(
-                    ["flatpak", "list", "--app", "--columns=name,version"],
-                    capture_output=True, text=True, timeout=10
-                )
-                for line in result.stdout.split('\n')[1:]:  # Skip header
-                    if '\t' in line:
-                        pkg, ver = line.split('\t', 1)
-                        installed[pkg.strip()] = {'version': ver.strip()}
+                lines = stream_command(["flatpak", "list", "--app", "--columns=name,version"])
+                next(lines, None)  # Skip header
+                for line in lines:
+                    if b'\t' in line:
+                        pkg, ver = line.split(b'\t', 1)
+                        installed[_decode(pkg.strip())] = _decode(ver.strip())
                         
             elif self.pkg_manager == "winget":
-                result = subprocess.run(
-                    ["winget", "list"],
-                    capture_output=True, text=True, timeout=15
-                )
-                # Parse winget output (it's a formatted table)
-                lines = result.stdout.split('\n')
-                for line in lines[2:]:  # Skip header lines
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        installed[parts[0]] = {'version': parts[1]}
+                installed = self._parse_winget_list(stream_command(["winget", "list"]))
                         
         except subprocess.TimeoutExpired:
-            print(f"[PackageManager] Timeout getting installed packages for {self.pkg_manager}")
+            log.warning(f"[PackageManager] Timeout getting installed packages for {self.pkg_manager}")
+            return None
         except Exception as e:
-            print(f"[PackageManager] Error getting installed packages: {e}")
+            log.error(f"[PackageManager] Error getting installed packages: {e}")
+            return None
+        
+        return installed
+    
+    def _parse_winget_list(self, lines):
+        """Parse winget's fixed-width table into {lowercased id and name: version}
         
+        Column boundaries come from the header row, so names containing
+        spaces don't shift the other fields.
+        """
+        installed = {}
+        header = None
+        for raw in lines:
+            # Drop the progress spinner winget draws with carriage returns
+            line = _decode(raw).rstrip().rsplit('\r', 1)[-1]
+            if header is None:
+                if 'Id' in line and 'Version' in line:
+                    header = line
+                    id_col = header.index('Id')
+                    version_col = header.index('Version')
+                    end_col = header.find('Available')
+                    if end_col < 0:
+                        end_col = header.find('Source')
+                    if end_col < 0:
+                        end_col = None
+                continue
+            if not line or line.startswith('-'):
+                continue
+            
+            name = line[:id_col].strip()
+            pkg_id = line[id_col:version_col].strip()
+            version = line[version_col:end_col].strip()
+            if pkg_id:
+                installed[pkg_id.lower()] = version
+            if name:
+                installed[name.lower()] = version
         return installed
     
+    def get_outdated_packages(self):
+        """Get all packages with a pending update in one batch operation - returns {name: new_version}, or None on failure"""
+        outdated = {}
+        
+        try:
+            if self.pkg_manager == "brew":
+                result = run_command(
+                    ["brew", "outdated", "--greedy", "--json=v2"],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=QUERY_TIMEOUT
+                )
+                if result.stdout.strip():
+                    data = json.loads(result.stdout)
+                    for entry in data.get('formulae', []) + data.get('casks', []):
+                        outdated[entry['name']] = entry.get('current_version')
+                        
+            elif self.pkg_manager == "apt":
+                # Lines look like: name/suite 1.2.3 amd64 [upgradable from: 1.2.2]
+                result = run_command(
+                    ["apt", "list", "--upgradable"],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=QUERY_TIMEOUT
+                )
+                for line in result.stdout.splitlines():
+                    if b'/' in line and b'[upgradable from:' in line:
+                        name, rest = line.split(b'/', 1)
+                        parts = rest.split()
+                        if len(parts) >= 2:
+                            outdated[_decode(name)] = _decode(parts[1])
+                            
+            elif self.pkg_manager in ["dnf", "yum"]:
+                # Lines look like: name.arch  [epoch:]version-release  repo
+                # Exit code 100 means updates are available
+                result = run_command(
+                    [self.pkg_manager, "check-update", "--quiet"],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=QUERY_TIMEOUT
+                )
+                for line in result.stdout.splitlines():
+                    if line.startswith(b'Obsoleting'):
+                        break
+                    parts = line.split()
+                    if len(parts) == 3 and b'.' in parts[0]:
+                        name = parts[0].rsplit(b'.', 1)[0]
+                        version = parts[1].split(b':')[-1].rsplit(b'-', 1)[0]
+                        outdated[_decode(name)] = _decode(version)
+                            
+        except subprocess.TimeoutExpired:
+            log.warning(f"[PackageManager] Timeout getting outdated packages for {self.pkg_manager}")
+            return None
+        except Exception as e:
+            log.error(f"[PackageManager] Error getting outdated packages: {e}")
+            return None
+        
+        return outdated
+    
     def install_package(self, package):
         """Install a package - returns (success, error_message)"""
         # Check if it's a GitHub repository
@@ -454,55 +809,130 @@ class PackageManager:
         try:
             if self.pkg_manager == "brew":
                 # Try cask first, fall back to formula
-                result = subprocess.run(
+                result = run_command(
                     ["brew", "install", "--cask", package],
-                    capture_output=True, text=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=INSTALL_TIMEOUT
                 )
                 if result.returncode != 0:
-                    result = subprocess.run(
+                    result = run_command(
                         ["brew", "install", package],
-                        capture_output=True, text=True, check=True
+                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True, timeout=INSTALL_TIMEOUT
                     )
                 return (True, None)
                 
             elif self.pkg_manager == "apt":
-                result = subprocess.run(
+                result = run_command(
                     ["sudo", "apt-get", "install", "-y", package],
-                    capture_output=True, text=True, check=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True, timeout=INSTALL_TIMEOUT
                 )
                 return (True, None)
                 
             elif self.pkg_manager == "dnf":
-                result = subprocess.run(
+                result = run_command(
                     ["sudo", "dnf", "install", "-y", package],
-                    capture_output=True, text=True, check=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True, timeout=INSTALL_TIMEOUT
                 )
                 return (True, None)
                 
             elif self.pkg_manager == "winget":
-                result = subprocess.run(
+                result = run_command(
                     ["winget", "install", "-e", "--id", package],
-                    capture_output=True, text=True, check=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True, timeout=INSTALL_TIMEOUT
                 )
                 return (True, None)
                 
         except subprocess.CalledProcessError as e:
             error_msg = f"Error installing {package}: {e.stderr if e.stderr else str(e)}"
-            print(error_msg)
+            log.error(error_msg)
+            return (False, error_msg)
+        except subprocess.TimeoutExpired as e:
+            error_msg = f"Timed out installing {package} after {e.timeout}s"
+            log.error(error_msg)
             return (False, error_msg)
+        finally:
+            self.clear_listing_cache()
         
         return (False, f"Package manager '{self.pkg_manager}' not supported for {package}")
     
+    def install_packages(self, packages):
+        """Install several packages with as few package manager runs as possible
+        
+        Returns {package: (success, error_message)} in the order given.
+        """
+        github = [p for p in packages if p.startswith('github:')]
+        native = [p for p in packages if not p.startswith('github:')]
+        results = {}
+        
+        # Clones are network-bound and independent, so they run alongside the native install
+        with ThreadPoolExecutor(max_workers=max(1, min(4, len(github)))) as executor:
+            github_futures = {package: executor.submit(self.install_package, package) for package in github}
+            
+            if len(native) == 1 or self.pkg_manager not in ("brew", "apt", "dnf"):
+                # Nothing to batch, or no bulk install (winget)
+                for package in native:
+                    results[package] = self.install_package(package)
+            elif native:
+                results.update(self._install_batch(native))
+            
+            for package, future in github_futures.items():
+                results[package] = future.result()
+        
+        return {package: results[package] for package in packages}
+    
+    def _install_batch(self, packages):
+        """Install packages in one package manager transaction - returns {package: (success, error_message)}"""
+        try:
+            if self.pkg_manager == "brew":
+                # Try everything as casks first, then the rest as formulae in one more run
+                result = run_command(
+                    ["brew", "install", "--cask", *packages],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=INSTALL_TIMEOUT
+                )
+                installed = self.get_all_installed_packages() or {}
+                remaining = [p for p in packages if p not in installed]
+                if remaining:
+                    result = run_command(
+                        ["brew", "install", *remaining],
+                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=INSTALL_TIMEOUT
+                    )
+                    installed = self.get_all_installed_packages() or {}
+                
+                results = {}
+                for package in packages:
+                    if package in installed:
+                        results[package] = (True, None)
+                    else:
+                        error_msg = f"Error installing {package}: {result.stderr.strip() or 'brew install failed'}"
+                        log.error(error_msg)
+                        results[package] = (False, error_msg)
+                return results
+            
+            else:
+                result = run_command(
+                    ["sudo", "apt-get" if self.pkg_manager == "apt" else "dnf", "install", "-y", *packages],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=INSTALL_TIMEOUT
+                )
+                if result.returncode == 0:
+                    return {package: (True, None) for package in packages}
+                
+                # One unknown name aborts the whole transaction - retry singly to find which
+                log.warning(f"[PackageManager] Batch install failed, retrying one at a time: {result.stderr.strip()}")
+                return {package: self.install_package(package) for package in packages}
+        except subprocess.TimeoutExpired as e:
+            error_msg = f"Timed out installing {', '.join(packages)} after {e.timeout}s"
+            log.error(error_msg)
+            return {package: (False, error_msg) for package in packages}
+        finally:
+            self.clear_listing_cache()
+    
     def install_from_github(self, repo):
         """Install from GitHub repository (e.g., 'mcmonkeyprojects/SwarmUI') - returns (success, error_message)"""
         try:
-            import shutil
-            
             # Parse owner/repo
             parts = repo.split('/')
             if len(parts) != 2:
                 error = f"Invalid GitHub repo format: {repo}. Use 'owner/repo'"
-                print(error)
+                log.error(error)
                 return (False, error)
             
             owner, repo_name = parts
@@ -510,83 +940,79 @@ class PackageManager:
             # Check if git is installed
             if not self.command_exists("git"):
                 error = "Git is not installed. Please install git first."
-                print(error)
+                log.error(error)
                 return (False, error)
             
-            # Determine installation directory based on base_dir
-            # Check if we're running in a webroot structure (desktop/install)
-            base_path = Path(self.base_dir).resolve()
-            
-            # Check if base_dir ends with 'desktop/install' or 'install'
-            if base_path.name == 'install' and base_path.parent.name == 'desktop':
-                # We're in desktop/install, install to webroot
-                webroot = base_path.parent.parent
-                install_dir = webroot / repo_name
-                print(f"Detected webroot structure. Installing to {install_dir}")
-            elif base_path.name == 'install':
-                # We're in install but not under desktop - use parent as webroot
-                webroot = base_path.parent
-                install_dir = webroot / repo_name
-                print(f"Installing to webroot: {install_dir}")
+            install_dir, exists = self._github_install_dir(repo_name)
+            if self.webroot is not None:
+                log.info(f"Installing to {install_dir}")
             else:
                 # Not in webroot structure - use ~/Applications/GitHub
-                apps_dir = Path.home() / "Applications" / "GitHub"
-                apps_dir.mkdir(parents=True, exist_ok=True)
-                install_dir = apps_dir / repo_name
+                self.github_fallback.mkdir(parents=True, exist_ok=True)
                 
                 # Warn user about webroot recommendation
                 warning = f"⚠️  Not running in webroot. Repo will be installed to {install_dir}. For web access, run the installer from a webroot (e.g., http://localhost:8000/desktop/install) so repos can be accessed at http://localhost:8000/{repo_name}"
-                print(warning)
+                log.warning(warning)
             
-            # Clone if not exists, pull if exists
-            if install_dir.exists():
-                print(f"Updating {repo_name}...")
-                result = subprocess.run(
-                    ["git", "pull"],
-                    cwd=install_dir,
-                    capture_output=True, text=True
+            # Only the latest commit is fetched; fail instead of waiting on a credential prompt.
+            # git's progress output is discarded - stderr is kept for the error message.
+            git_env = {**os.environ, 'GIT_TERMINAL_PROMPT': '0'}
+            
+            # Clone if not exists, update to the remote tip if exists
+            if exists:
+                log.info(f"Updating {repo_name}...")
+                result = run_command(
+                    ["git", "fetch", "--depth=1", "origin", "HEAD"],
+                    cwd=install_dir, env=git_env,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=INSTALL_TIMEOUT
                 )
+                if result.returncode == 0:
+                    # A shallow fetch can't be merged; --keep refuses to drop local edits
+                    result = run_command(
+                        ["git", "reset", "--keep", "FETCH_HEAD"],
+                        cwd=install_dir, env=git_env,
+                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=QUERY_TIMEOUT
+                    )
                 if result.returncode != 0:
-                    error = f"Git pull failed: {result.stderr}"
-                    print(error)
+                    error = f"Git update failed: {result.stderr}"
+                    log.error(error)
                     return (False, error)
             else:
-                print(f"Cloning {repo}...")
-                result = subprocess.run(
-                    ["git", "clone", f"https://github.com/{repo}.git", str(install_dir)],
-                    capture_output=True, text=True
+                log.info(f"Cloning {repo}...")
+                result = run_command(
+                    ["git", "clone", "--depth=1", "--single-branch",
+                     f"https://github.com/{repo}.git", str(install_dir)],
+                    env=git_env,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=INSTALL_TIMEOUT
                 )
                 if result.returncode != 0:
                     error = f"Git clone failed: {result.stderr}"
-                    print(error)
+                    log.error(error)
                     return (False, error)
             
             # Special handling for SwarmUI
             if repo_name == "SwarmUI":
-                print("Setting up SwarmUI...")
+                log.info("Setting up SwarmUI...")
                 
                 # On macOS, run the install script
                 if self.os_type == "macos":
                     install_script = install_dir / "launchtools" / "install-mac.sh"
                     if not install_script.exists():
                         error = f"Install script not found: {install_script}"
-                        print(error)
+                        log.error(error)
                         return (False, error)
                     
-                    # Make it executable
-                    subprocess.run(["chmod", "+x", str(install_script)])
-                    
-                    # Run the install script
-                    result = subprocess.run(
-                        [str(install_script)],
+                    # Run the install script (through bash, so it needs no exec bit)
+                    result = run_command(
+                        ["bash", str(install_script)],
                         cwd=install_dir,
-                        capture_output=True, text=True
+                        capture_output=True, text=True, timeout=INSTALL_TIMEOUT
                     )
-                    print(f"SwarmUI install output: {result.stdout}")
+                    log.info(f"SwarmUI install output: {result.stdout}")
                     
                     if result.returncode != 0:
                         error = f"SwarmUI install script failed: {result.stderr}\nStdout: {result.stdout}"
-                        print(error)
+                        log.error(error)
                         return (False, error)
                     
                     # Create a launch script in a standard location
@@ -596,14 +1022,14 @@ cd "{install_dir}"
 ./launchtools/launch-mac.sh
 """
                     launch_script_path.write_text(launch_script)
-                    subprocess.run(["chmod", "+x", str(launch_script_path)])
+                    launch_script_path.chmod(launch_script_path.stat().st_mode | 0o111)
                     
-                    print(f"Created launch script at {launch_script_path}")
+                    log.info(f"Created launch script at {launch_script_path}")
                     
                     # If in webroot, provide web access info
-                    if 'webroot' in locals():
+                    if self.webroot is not None:
                         success_msg = f"SwarmUI installed successfully! Access at http://localhost:PORT/{repo_name}"
-                        print(success_msg)
+                        log.info(success_msg)
                     
                     return (True, None)
                 
@@ -612,20 +1038,19 @@ cd "{install_dir}"
                     install_script = install_dir / "launchtools" / "install-linux.sh"
                     if not install_script.exists():
                         error = f"Install script not found: {install_script}"
-                        print(error)
+                        log.error(error)
                         return (False, error)
                     
-                    subprocess.run(["chmod", "+x", str(install_script)])
-                    result = subprocess.run(
-                        [str(install_script)],
+                    result = run_command(
+                        ["bash", str(install_script)],
                         cwd=install_dir,
-                        capture_output=True, text=True
+                        capture_output=True, text=True, timeout=INSTALL_TIMEOUT
                     )
-                    print(f"SwarmUI install output: {result.stdout}")
+                    log.info(f"SwarmUI install output: {result.stdout}")
                     
                     if result.returncode != 0:
                         error = f"SwarmUI install script failed: {result.stderr}"
-                        print(error)
+                        log.error(error)
                         return (False, error)
                     
                     return (True, None)
@@ -635,64 +1060,137 @@ cd "{install_dir}"
                     install_script = install_dir / "launchtools" / "install-windows.bat"
                     if not install_script.exists():
                         error = f"Install script not found: {install_script}"
-                        print(error)
+                        log.error(error)
                         return (False, error)
                     
-                    result = subprocess.run(
-                        [str(install_script)],
+                    # Hand the batch file straight to cmd.exe rather than through shell=True
+                    result = run_command(
+                        ["cmd.exe", "/c", str(install_script)],
                         cwd=install_dir,
-                        capture_output=True, text=True,
-                        shell=True
+                        capture_output=True, text=True, timeout=INSTALL_TIMEOUT
                     )
-                    print(f"SwarmUI install output: {result.stdout}")
+                    log.info(f"SwarmUI install output: {result.stdout}")
                     
                     if result.returncode != 0:
                         error = f"SwarmUI install script failed: {result.stderr}"
-                        print(error)
+                        log.error(error)
                         return (False, error)
                     
                     return (True, None)
             
             # Generic GitHub repo install - just clone
-            print(f"Successfully installed {repo_name} to {install_dir}")
+            log.info(f"Successfully installed {repo_name} to {install_dir}")
             return (True, None)
             
         except subprocess.CalledProcessError as e:
             error = f"Error installing from GitHub {repo}: {e.stderr if e.stderr else str(e)}"
-            print(error)
+            log.error(error)
             return (False, error)
         except Exception as e:
             error = f"Unexpected error installing {repo}: {str(e)}"
-            print(error)
+            log.error(error)
             return (False, error)
     
+    def update_packages(self, packages):
+        """Update several packages with as few package manager runs as possible - returns {package: success}"""
+        if len(packages) > 1 and self.pkg_manager in ("brew", "apt"):
+            if self._update_batch(packages):
+                return {package: True for package in packages}
+            # One failure fails the whole run - retry singly to find which
+            log.warning("[PackageManager] Batch update failed, retrying one at a time")
+        return {package: self.update_package(package) for package in packages}
+    
+    def _update_batch(self, packages):
+        """Update packages in one package manager run per package type - returns whether all succeeded"""
+        try:
+            if self.pkg_manager == "brew":
+                casks, _ = self._brew_installed()
+                cask_packages = [p for p in packages if p in casks]
+                formula_packages = [p for p in packages if p not in casks]
+                # brew takes a lock per keg, so the two runs go one after the other
+                for type_arg, group in (("--cask", cask_packages), ("--formula", formula_packages)):
+                    if group:
+                        result = run_command(
+                            ["brew", "upgrade", type_arg, *group],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=INSTALL_TIMEOUT
+                        )
+                        if result.returncode != 0:
+                            return False
+                return True
+            
+            result = run_command(
+                ["sudo", "apt-get", "install", "--only-upgrade", "-y", *packages],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=INSTALL_TIMEOUT
+            )
+            return result.returncode == 0
+        except subprocess.TimeoutExpired as e:
+            log.error(f"Timed out updating {', '.join(packages)} after {e.timeout}s")
+            return False
+        finally:
+            self.clear_listing_cache()
+    
     def update_package(self, package):
         """Update a package"""
         try:
             if self.pkg_manager == "brew":
-                subprocess.run(
-                    ["brew", "upgrade", "--cask", package],
-                    capture_output=True, text=True
-                )
-                subprocess.run(
-                    ["brew", "upgrade", package],
-                    capture_output=True, text=True
+                run_command(
+                    ["brew", "upgrade", *self._brew_type_args(package), package],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=INSTALL_TIMEOUT
                 )
                 return True
                 
             elif self.pkg_manager == "apt":
-                subprocess.run(
+                run_command(
                     ["sudo", "apt-get", "install", "--only-upgrade", "-y", package],
-                    capture_output=True, text=True, check=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=INSTALL_TIMEOUT
                 )
                 return True
                 
-        except subprocess.CalledProcessError as e:
-            print(f"Error updating {package}: {e}")
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            log.error(f"Error updating {package}: {e}")
             return False
+        finally:
+            self.clear_listing_cache()
         
         return False
     
+    def uninstall_packages(self, packages):
+        """Uninstall several packages - returns {package: success}
+        
+        With brew, casks and formulae are each removed in a single run.
+        """
+        native = [p for p in packages if not p.startswith('github:')]
+        if self.pkg_manager != "brew" or len(native) < 2:
+            return {package: self.uninstall_package(package) for package in packages}
+        
+        results = {package: self.uninstall_package(package) for package in packages if package not in native}
+        targets = set()
+        still_installed = set(native)
+        try:
+            casks, formulae = self._brew_installed()
+            for type_arg, group in (("--cask", [p for p in native if p in casks]),
+                                    ("--formula", [p for p in native if p in formulae])):
+                if group:
+                    targets.update(group)
+                    result = run_command(
+                        ["brew", "uninstall", type_arg, *group],
+                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=INSTALL_TIMEOUT
+                    )
+                    if result.returncode != 0:
+                        log.error(f"Error uninstalling {', '.join(group)}: "
+                                  f"{_decode(result.stderr).strip() or 'brew uninstall failed'}")
+            self.clear_listing_cache()
+            # One exit code covers the whole run, so check each package against a fresh listing
+            casks, formulae = self._brew_installed()
+            still_installed = casks | formulae
+        except subprocess.TimeoutExpired as e:
+            log.error(f"Error uninstalling {', '.join(native)}: {e}")
+            self.clear_listing_cache()
+        
+        for package in native:
+            results[package] = package in targets and package not in still_installed
+        return {package: results[package] for package in packages}
+    
     def uninstall_package(self, package):
         """Uninstall a package"""
         # Check if it's a GitHub repository
@@ -702,29 +1200,11 @@ cd "{install_dir}"
             if len(parts) == 2:
                 repo_name = parts[1]
                 
-                # Check webroot location first
-                base_path = Path(self.base_dir).resolve()
-                install_dir = None
-                
-                if base_path.name == 'install' and base_path.parent.name == 'desktop':
-                    # Check webroot
-                    webroot = base_path.parent.parent
-                    install_dir = webroot / repo_name
-                elif base_path.name == 'install':
-                    # Check parent as webroot
-                    webroot = base_path.parent
-                    install_dir = webroot / repo_name
-                
-                # Fallback to ~/Applications/GitHub if not found in webroot
-                if not install_dir or not install_dir.exists():
-                    apps_dir = Path.home() / "Applications" / "GitHub"
-                    install_dir = apps_dir / repo_name
-                
+                install_dir, exists = self._github_install_dir(repo_name)
                 try:
-                    if install_dir.exists():
-                        import shutil
-                        shutil.rmtree(install_dir)
-                        print(f"Removed {repo_name} from {install_dir}")
+                    if exists:
+                        remove_tree(install_dir)
+                        log.info(f"Removed {repo_name} from {install_dir}")
                         
                         # Also remove launch script if it exists
                         launch_script = Path.home() / "Applications" / f"launch-{repo_name.lower()}.sh"
@@ -733,59 +1213,57 @@ cd "{install_dir}"
                         
                         return True
                     return False
+                except subprocess.CalledProcessError as e:
+                    log.error(f"Error removing {repo_name}: {e.stderr.strip() or e}")
+                    return False
                 except Exception as e:
-                    print(f"Error removing {repo_name}: {e}")
+                    log.error(f"Error removing {repo_name}: {e}")
                     return False
         
         # Regular package manager uninstall
         try:
             if self.pkg_manager == "brew":
-                # Try uninstalling as cask first
-                result = subprocess.run(
-                    ["brew", "uninstall", "--cask", package],
-                    capture_output=True, text=True
-                )
-                if result.returncode == 0:
-                    return True
-                    
-                # Try as formula
-                result = subprocess.run(
-                    ["brew", "uninstall", package],
-                    capture_output=True, text=True
+                result = run_command(
+                    ["brew", "uninstall", *self._brew_type_args(package), package],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=INSTALL_TIMEOUT
                 )
+                if result.returncode != 0:
+                    log.error(f"Error uninstalling {package}: {_decode(result.stderr).strip() or 'brew uninstall failed'}")
                 return result.returncode == 0
                 
             elif self.pkg_manager == "apt":
-                subprocess.run(
+                run_command(
                     ["sudo", "apt-get", "remove", "-y", package],
-                    capture_output=True, text=True, check=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True, timeout=INSTALL_TIMEOUT
                 )
                 return True
                 
             elif self.pkg_manager in ["dnf", "yum"]:
-                subprocess.run(
+                run_command(
                     ["sudo", self.pkg_manager, "remove", "-y", package],
-                    capture_output=True, text=True, check=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True, timeout=INSTALL_TIMEOUT
                 )
                 return True
                 
             elif self.pkg_manager == "flatpak":
-                subprocess.run(
+                run_command(
                     ["flatpak", "uninstall", "-y", package],
-                    capture_output=True, text=True, check=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True, timeout=INSTALL_TIMEOUT
                 )
                 return True
                 
             elif self.pkg_manager == "winget":
-                subprocess.run(
+                run_command(
                     ["winget", "uninstall", package],
-                    capture_output=True, text=True, check=True
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True, timeout=INSTALL_TIMEOUT
                 )
                 return True
                 
-        except subprocess.CalledProcessError as e:
-            print(f"Error uninstalling {package}: {e}")
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            log.error(f"Error uninstalling {package}: {_decode(e.stderr).strip() if e.stderr else e}")
             return False
+        finally:
+            self.clear_listing_cache()
         
         return False
 
@@ -794,47 +1272,75 @@ class LLMIntegration:
     """Handle LLM API integration"""
     
     def __init__(self):
+        self.env_path = Path(__file__).parent.parent.parent / "docker" / ".env"
+        self._env_mtime = self._env_file_mtime()
         self.api_key = self.load_api_key()
+        self._client = None
+        self._client_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """Anthropic client, created on first use and reused so its connection pool stays warm"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import anthropic
+                    self._client = anthropic.Anthropic(api_key=self.api_key)
+        return self._client
+    
+    def _env_file_mtime(self):
+        """Get the .env file's mtime, or None if it doesn't exist"""
+        try:
+            return self.env_path.stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def _reload_if_changed(self):
+        """Re-read the API key if .env changed since it was read; a different key gets a new client"""
+        mtime = self._env_file_mtime()
+        if mtime == self._env_mtime:
+            return
+        
+        with self._client_lock:
+            if mtime != self._env_mtime:
+                self._env_mtime = mtime
+                api_key = self.load_api_key()
+                if api_key != self.api_key:
+                    self.api_key = api_key
+                    self._client = None
     
     def load_api_key(self):
-        """Load API key from .env file two levels up"""
-        env_path = Path(__file__).parent.parent.parent / "docker" / ".env"
-
-        if not env_path.exists():
+        """Load API key from the environment, else from .env file two levels up"""
+        value = os.environ.get('ANTHROPIC_API_KEY')
+        if value:
+            return value
+        
+        if not self.env_path.exists():
             return None
 
         try:
-            with open(env_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('ANTHROPIC_API_KEY='):
-                        # Get value after =, strip quotes and whitespace
-                        value = line.split('=', 1)[1].strip().strip('"\'')
-                        # Remove inline comments (# comment)
-                        if '#' in value:
-                            value = value.split('#')[0].strip()
-                        return value
+            match = _API_KEY_RE.search(self.env_path.read_text())
+            if match:
+                # An empty value means no key
+                return match.group(1).strip() or None
         except Exception as e:
-            print(f"Error loading API key: {e}")
+            log.error(f"Error loading API key: {e}")
 
         return None
     
     def send_prompt(self, prompt, context=""):
         """Send prompt to LLM API"""
+        self._reload_if_changed()
         if not self.api_key:
             return {
                 'success': False,
-                'error': 'No API key found in ../../docker/.env'
+                'error': 'No API key found in ANTHROPIC_API_KEY or ../../docker/.env'
             }
         
         try:
-            import anthropic
-            
-            client = anthropic.Anthropic(api_key=self.api_key)
-            
             message = f"{prompt}\n\nContext:\n{context}" if context else prompt
             
-            response = client.messages.create(
+            response = self.client.messages.create(
                 model="claude-sonnet-4-20250514",
                 max_tokens=4000,
                 messages=[
@@ -859,28 +1365,135 @@ class LLMIntegration:
             }
 
 
+class JobQueue:
+    """Runs install, update and uninstall jobs on a background worker so requests return immediately"""
+    
+    MAX_FINISHED_JOBS = 100
+    
+    def __init__(self, package_manager):
+        self.package_manager = package_manager
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+    
+    def start(self, workers=1):
+        """Start worker threads - one by default, so package manager runs never overlap"""
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+    
+    def submit(self, kind, packages):
+        """Queue an 'install', 'update' or 'uninstall' job - returns its id"""
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'packages': packages,
+            'status': 'queued',
+            'created': time.time()
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job['id']] = job
+        self._queue.put(job['id'])
+        return job['id']
+    
+    def get(self, job_id):
+        """Get a snapshot of a job, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+    
+    def _prune(self):
+        """Forget the oldest finished jobs once there are too many"""
+        finished = [j for j in self._jobs.values() if j['status'] in ('done', 'failed')]
+        excess = len(finished) - self.MAX_FINISHED_JOBS
+        for job in sorted(finished, key=lambda j: j['created'])[:max(0, excess)]:
+            del self._jobs[job['id']]
+    
+    def _worker(self):
+        """Drain the queue, running one job at a time"""
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs[job_id]
+                job['status'] = 'running'
+            
+            try:
+                update = self._run(job['kind'], job['packages'])
+                update['status'] = 'done'
+            except Exception as e:
+                log.error(f"[JobQueue] Job {job_id} failed: {e}")
+                update = {'status': 'failed', 'success': False, 'error': str(e)}
+            
+            with self._lock:
+                job.update(update)
+            self._queue.task_done()
+    
+    def _run(self, kind, packages):
+        """Run a job - returns the fields of the finished job, shaped like the old synchronous responses"""
+        results = {}
+        errors = {}
+        
+        if kind == 'install':
+            for package, (success, error_msg) in self.package_manager.install_packages(packages).items():
+                results[package] = success
+                if not success and error_msg:
+                    errors[package] = error_msg
+        elif kind == 'uninstall':
+            results = self.package_manager.uninstall_packages(packages)
+        else:
+            results = self.package_manager.update_packages(packages)
+        self.package_manager.patch_cache(results)
+        
+        finished = {'success': True, 'results': results}
+        if errors:
+            finished['errors'] = errors
+        return finished
+
+
 class APIHandler(SimpleHTTPRequestHandler):
     """Custom HTTP request handler for API endpoints"""
     
+    # Keep connections open between requests; an idle one holds a pool worker,
+    # so it is dropped after timeout seconds
+    protocol_version = 'HTTP/1.1'
+    timeout = 2
+    
     package_manager = None
     llm = None
+    jobs = None
+    # {path: (mtime_ns, content, content type)} for serve_file
+    _file_cache = {}
+    # (llm_available, encoded body) for /api/status - the rest is fixed at startup
+    _status_cache = None
+    
+    # Exact-path routes: {path: handler(self)} for GET, {path: handler(self, data)} for POST
+    _GET_ROUTES = {
+        '/': lambda self: self.serve_file('index.html'),
+        # When serving from webroot
+        '/desktop/install/': lambda self: self.serve_file('desktop/install/index.html'),
+        '/desktop/install': lambda self: self.serve_file('desktop/install/index.html'),
+        '/api/status': lambda self: self.handle_status(),
+        '/api/packages': lambda self: self.handle_packages(),
+    }
+    _POST_ROUTES = {
+        '/api/install': lambda self, data: self.handle_install(data),
+        '/api/update': lambda self, data: self.handle_update(data),
+        '/api/uninstall': lambda self, data: self.handle_uninstall(data),
+        '/api/execute': lambda self, data: self.handle_execute(data),
+        '/api/llm': lambda self, data: self.handle_llm(data),
+        '/api/refresh': lambda self, data: self.handle_refresh(),
+    }
     
     def do_GET(self):
         """Handle GET requests"""
-        parsed_path = urlparse(self.path)
+        path = urlparse(self.path).path
         
-        # Handle root path
-        if parsed_path.path == '/':
-            self.serve_file('index.html')
-        # Handle /desktop/install/ path (when serving from webroot)
-        elif parsed_path.path == '/desktop/install/' or parsed_path.path == '/desktop/install':
-            self.serve_file('desktop/install/index.html')
-        # API endpoints
-        elif parsed_path.path == '/api/status':
-            self.handle_status()
-        elif parsed_path.path == '/api/packages':
-            self.handle_packages()
-        elif parsed_path.path.startswith('/api/'):
+        handler = self._GET_ROUTES.get(path)
+        if handler:
+            handler(self)
+        elif path.startswith('/api/jobs/'):
+            self.handle_job(path[len('/api/jobs/'):])
+        elif path.startswith('/api/'):
             self.send_json_response({'error': 'Not found'}, 404)
         else:
             super().do_GET()
@@ -897,57 +1510,45 @@ class APIHandler(SimpleHTTPRequestHandler):
             self.send_json_response({'error': 'Invalid JSON'}, 400)
             return
         
-        if parsed_path.path == '/api/install':
-            self.handle_install(data)
-        elif parsed_path.path == '/api/update':
-            self.handle_update(data)
-        elif parsed_path.path == '/api/uninstall':
-            self.handle_uninstall(data)
-        elif parsed_path.path == '/api/execute':
-            self.handle_execute(data)
-        elif parsed_path.path == '/api/llm':
-            self.handle_llm(data)
-        elif parsed_path.path == '/api/refresh':
-            self.handle_refresh()
+        handler = self._POST_ROUTES.get(parsed_path.path)
+        if handler:
+            handler(self, data)
         else:
             self.send_json_response({'error': 'Not found'}, 404)
     
     def handle_status(self):
-        """Return server status"""
-        self.send_json_response({
-            'version': VERSION,
-            'os': self.package_manager.os_type,
-            'package_manager': self.package_manager.pkg_manager,
-            'llm_available': self.llm.api_key is not None
-        })
+        """Return server status, encoded once and again only if the API key appears or goes away"""
+        llm_available = self.llm.api_key is not None
+        cached = APIHandler._status_cache
+        if cached is None or cached[0] != llm_available:
+            cached = (llm_available, _dumps({
+                'version': VERSION,
+                'os': self.package_manager.os_type,
+                'package_manager': self.package_manager.pkg_manager,
+                'llm_available': llm_available
+            }))
+            APIHandler._status_cache = cached
+        self._send_raw_json(cached[1])
     
     def handle_packages(self):
         """Return package status"""
-        packages = self.package_manager.get_all_packages_status()
-        self.send_json_response({
-            'packages': packages,
-            'os': self.package_manager.os_type,
-            'package_manager': self.package_manager.pkg_manager
-        })
+        gzipped = self._accepts_gzip()
+        self._send_raw_json(self.package_manager.get_packages_json(gzipped), gzipped=gzipped)
     
     def handle_refresh(self):
         """Force refresh package cache only if needed"""
         # Check if cache is recent (less than 10 seconds old)
-        current_time = time.time()
-        cache_age = current_time - self.package_manager.cache_time
+        packages_json, cache_time = self.package_manager.get_packages_list_json()
+        cache_age = time.time() - cache_time
         
         if cache_age < 10:
-            # Cache is fresh, return it immediately
-            packages = self.package_manager.get_all_packages_status(force_refresh=False)
-            self.send_json_response({
-                'success': True,
-                'packages': packages,
-                'cached': True,
-                'cache_age': round(cache_age, 2)
-            })
+            # Cache is fresh, return its already encoded list immediately
+            self._send_raw_json(b'{"success":true,"packages":%s,"cached":true,"cache_age":%s}' % (
+                packages_json, _dumps(round(cache_age, 2))
+            ))
         else:
-            # Cache is stale, refresh it
-            packages = self.package_manager.get_all_packages_status(force_refresh=True)
+            # Cache is stale, have the background refresher rebuild it
+            packages = self.package_manager.refresh(timeout=QUERY_TIMEOUT * 2)
             self.send_json_response({
                 'success': True,
                 'packages': packages,
@@ -962,23 +1563,8 @@ class APIHandler(SimpleHTTPRequestHandler):
             self.send_json_response({'error': 'No packages specified'}, 400)
             return
         
-        results = {}
-        errors = {}
-        for package in packages:
-            success, error_msg = self.package_manager.install_package(package)
-            results[package] = success
-            if not success and error_msg:
-                errors[package] = error_msg
-        
-        response = {
-            'success': True,
-            'results': results
-        }
-        
-        if errors:
-            response['errors'] = errors
-        
-        self.send_json_response(response)
+        job_id = self.jobs.submit('install', packages)
+        self.send_json_response({'success': True, 'job_id': job_id}, 202)
     
     def handle_update(self, data):
         """Handle package updates"""
@@ -993,14 +1579,16 @@ class APIHandler(SimpleHTTPRequestHandler):
             all_packages = self.package_manager.get_all_packages_status()
             packages = [p['name'] for p in all_packages if p['update_available']]
         
-        results = {}
-        for package in packages:
-            results[package] = self.package_manager.update_package(package)
-        
-        self.send_json_response({
-            'success': True,
-            'results': results
-        })
+        job_id = self.jobs.submit('update', packages)
+        self.send_json_response({'success': True, 'job_id': job_id}, 202)
+    
+    def handle_job(self, job_id):
+        """Return the status of a queued install, update or uninstall job"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            self.send_json_response({'error': 'Unknown job'}, 404)
+        else:
+            self.send_json_response(job)
     
     def handle_uninstall(self, data):
         """Handle package uninstallation"""
@@ -1010,14 +1598,8 @@ class APIHandler(SimpleHTTPRequestHandler):
             self.send_json_response({'error': 'No packages specified'}, 400)
             return
         
-        results = {}
-        for package in packages:
-            results[package] = self.package_manager.uninstall_package(package)
-        
-        self.send_json_response({
-            'success': True,
-            'results': results
-        })
+        job_id = self.jobs.submit('uninstall', packages)
+        self.send_json_response({'success': True, 'job_id': job_id}, 202)
     
     def handle_execute(self, data):
         """Handle command execution"""
@@ -1031,7 +1613,7 @@ class APIHandler(SimpleHTTPRequestHandler):
         safe_commands = {
             'detect_os': lambda: {'os': self.package_manager.os_type},
             'detect_pm': lambda: {'package_manager': self.package_manager.pkg_manager},
-            'list_packages': lambda: {'packages': self.package_manager.read_packages()[0]},
+            'list_packages': lambda: {'packages': self.package_manager.enabled_packages()},
             'server_version': lambda: {'version': VERSION},
             'stop_server': self.stop_server,
         }
@@ -1044,11 +1626,11 @@ class APIHandler(SimpleHTTPRequestHandler):
 
     def stop_server(self):
         """Stop the server after responding to the client."""
-        def shutdown_server():
-            time.sleep(0.2)
-            self.server.shutdown()
-
-        threading.Thread(target=shutdown_server, daemon=True).start()
+        # shutdown() waits for serve_forever to exit, so it can't run on a thread it must wait for;
+        # this response still goes out since the interpreter joins pool workers before exiting
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+        # Don't hold the process open waiting on this keep-alive connection
+        self.close_connection = True
         return {'message': 'Server shutdown initiated'}
     
     def handle_llm(self, data):
@@ -1065,43 +1647,128 @@ class APIHandler(SimpleHTTPRequestHandler):
     
     def send_json_response(self, data, status=200):
         """Send JSON response"""
+        self._send_raw_json(_dumps(data), status)
+    
+    def _accepts_gzip(self):
+        """Check whether the client takes gzip-encoded responses"""
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+    
+    def _send_raw_json(self, body, status=200, gzipped=False):
+        """Send an already encoded (and possibly gzipped) JSON body"""
         self.send_response(status)
         self.send_header('Content-type', 'application/json')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
     
     def serve_file(self, filename):
-        """Serve a static file"""
+        """Serve a static file, keeping its bytes in memory until the file changes"""
         try:
             # Use current working directory (which may be webroot if detected)
             file_path = Path.cwd() / filename
-            with open(file_path, 'rb') as f:
-                content = f.read()
+            mtime = file_path.stat().st_mtime_ns
+            
+            cached = self._file_cache.get(file_path)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, file_path.read_bytes(), CONTENT_TYPES.get(file_path.suffix))
+                self._file_cache[file_path] = cached
+            _, content, content_type = cached
             
             self.send_response(200)
-            if filename.endswith('.html'):
-                self.send_header('Content-type', 'text/html')
-            elif filename.endswith('.js'):
-                self.send_header('Content-type', 'application/javascript')
-            elif filename.endswith('.css'):
-                self.send_header('Content-type', 'text/css')
-            elif filename.endswith('.conf'):
-                self.send_header('Content-type', 'text/plain')
+            if content_type:
+                self.send_header('Content-type', content_type)
+            self.send_header('Content-Length', str(len(content)))
             self.end_headers()
             self.wfile.write(content)
         except FileNotFoundError:
             self.send_error(404, f"File not found: {filename}")
     
+    def copyfile(self, source, outputfile):
+        """Send files for the static fallback with socket.sendfile, so the kernel copies them straight to the socket"""
+        if outputfile is self.wfile and hasattr(source, 'fileno'):
+            outputfile.flush()
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+    
     def log_message(self, format, *args):
         """Custom log format"""
-        print(f"[{self.log_date_time_string()}] {format % args}")
+        log.info("[%s] %s", self.log_date_time_string(), format % args)
+    
+    def log_error(self, format, *args):
+        """Log errors, except an idle keep-alive connection timing out, which is expected"""
+        if format.startswith("Request timed out"):
+            log.debug("[%s] %s", self.log_date_time_string(), format % args)
+        else:
+            super().log_error(format, *args)
+
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that handles connections on a fixed-size thread pool
+    
+    Threads are reused between requests and a burst of connections queues
+    for a free worker instead of spawning a thread each.
+    """
+    
+    # On Windows SO_REUSEADDR lets a bind succeed on a port another server is
+    # listening on, which would defeat main()'s fall back to the next port
+    allow_reuse_address = os.name != 'nt'
+    
+    def __init__(self, server_address, handler_class, max_workers=None):
+        # Created first: a failed bind calls server_close() from the base __init__;
+        # at least 8 workers so a browser's parallel keep-alive connections fit
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(8, min(32, (os.cpu_count() or 1) * 4)),
+            thread_name_prefix='http'
+        )
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+        super().__init__(server_address, handler_class)
+    
+    def process_request(self, request, client_address):
+        """Hand the connection to the pool instead of a new thread"""
+        with self._connections_lock:
+            self._connections.add(request)
+        self.executor.submit(self.process_request_thread, request, client_address)
+    
+    def shutdown_request(self, request):
+        with self._connections_lock:
+            self._connections.discard(request)
+        super().shutdown_request(request)
+    
+    def server_close(self):
+        super().server_close()
+        # Wake workers waiting on idle keep-alive connections so the process exits now;
+        # only the read side is shut, so a response being written still goes out
+        with self._connections_lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        self.executor.shutdown(wait=False)
 
 
-def is_port_in_use(port):
-    """Check if port is already in use"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
+def setup_logging(verbose=False):
+    """Send log records to stdout from a listener thread, so request threads never wait on console writes
+    
+    Returns the started QueueListener; stop it to flush pending records.
+    """
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, console)
+    
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(logging.DEBUG if verbose else logging.INFO)
+    log.propagate = False
+    listener.start()
+    return listener
 
 
 def main():
@@ -1114,49 +1781,45 @@ def main():
     parser.add_argument('--verbose', action='store_true', 
                        help='Enable verbose logging')
     args = parser.parse_args()
+    log_listener = setup_logging(args.verbose)
     
     # Initialize package manager
     base_dir = Path(__file__).parent
     pkg_mgr = PackageManager(base_dir)
+    pkg_mgr.start_background_refresh()
     llm = LLMIntegration()
     
     # Set class variables
     APIHandler.package_manager = pkg_mgr
     APIHandler.llm = llm
+    APIHandler.jobs = JobQueue(pkg_mgr)
+    APIHandler.jobs.start()
     
-    # Detect if we're in a webroot structure (desktop/install)
-    # If so, change working directory to webroot for serving files
-    base_path = base_dir.resolve()
-    serve_path = None
-    
-    if base_path.name == 'install' and base_path.parent.name == 'desktop':
-        # We're in desktop/install - serve from webroot (2 levels up)
-        webroot = base_path.parent.parent
-        serve_path = webroot
-        print(f"Detected webroot structure. Serving files from: {webroot}")
-        print(f"Access installer at: http://localhost:{{port}}/desktop/install/")
-    elif base_path.name == 'install':
-        # We're in install - serve from parent
-        webroot = base_path.parent
-        serve_path = webroot
-        print(f"Serving files from: {webroot}")
+    # When in a webroot structure (desktop/install), serve files from the webroot
+    serve_path = pkg_mgr.webroot
+    if serve_path:
+        print(f"Serving files from: {serve_path}")
+        if base_dir.resolve().parent.name == 'desktop':
+            print(f"Access installer at: http://localhost:{{port}}/desktop/install/")
     
     # Change to serving directory if detected
     if serve_path:
         os.chdir(serve_path)
     
-    # Find available port
+    # Start server on the first free port, binding directly so nothing can take it in between
     port = args.port
-    while is_port_in_use(port) and port < args.port + 10:
-        port += 1
+    while True:
+        try:
+            httpd = PooledHTTPServer(('', port), APIHandler)
+            break
+        except OSError:
+            if port >= args.port + 10:
+                raise
+            port += 1
     
     if port != args.port:
         print(f"Port {args.port} is in use, using port {port} instead")
     
-    # Start server
-    server_address = ('', port)
-    httpd = HTTPServer(server_address, APIHandler)
-    
     print(f"╔═══════════════════════════════════════════════════════════╗")
     print(f"║   Cross-Platform Package Manager Server v{VERSION}       ║")
     print(f"╠═══════════════════════════════════════════════════════════╣")
@@ -1173,6 +1836,9 @@ def main():
         print("\n\nShutting down server...")
         httpd.shutdown()
         print("Server stopped.")
+    finally:
+        httpd.server_close()
+        log_listener.stop()
 
 
 if __name__ == '__main__':